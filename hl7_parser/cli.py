@@ -3,12 +3,49 @@ Command line interface for HL7 parser.
 """
 import argparse
 import json
+import logging
 import sys
-from typing import List
+from typing import Iterable, Optional, TextIO
 from .parser import HL7FileParser
 from .models import Appointment
 
 
+def _write_json(appointments: Iterable[Appointment], out: TextIO,
+                indent: Optional[int] = None) -> int:
+    """
+    Write appointments to a stream as a JSON array, one object at a time.
+    
+    Produces the same text as json.dumps on the full list, without holding
+    every appointment's dictionary and the whole JSON document in memory.
+    
+    Args:
+        appointments: Appointments to serialize
+        out: Text stream to write to
+        indent: JSON indent, or None for compact output
+    
+    Returns:
+        Number of appointments written
+    """
+    if indent is None:
+        opening, separator, closing, trim = '[', ', ', ']', 1
+    else:
+        opening, separator, closing, trim = '[\n', ',\n', '\n]', 2
+    
+    # json.dumps builds a new encoder per call when given options, so one
+    # encoder configured the same way is shared by every appointment
+    encode = json.JSONEncoder(indent=indent, default=str).encode
+    
+    count = 0
+    for appointment in appointments:
+        # Encoding a one-item list gives the item indented as an array element
+        item = encode([appointment.to_dict()])[trim:-trim]
+        out.write((separator if count else opening) + item)
+        count += 1
+    
+    out.write(closing if count else '[]')
+    return count
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -16,8 +53,14 @@ def main():
     )
     parser.add_argument(
         'input_file',
+        nargs='?',
         help='Path to HL7 file'
     )
+    parser.add_argument(
+        '--batch-dir',
+        '-d',
+        help='Parse every HL7 file in this directory instead of a single file'
+    )
     parser.add_argument(
         '--output',
         '-o',
@@ -29,6 +72,13 @@ def main():
         action='store_true',
         help='Pretty print JSON output'
     )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        default=1,
+        help='Number of worker processes to parse a single file on (default: 1)'
+    )
     parser.add_argument(
         '--errors',
         '-e',
@@ -38,27 +88,30 @@ def main():
     )
     
     args = parser.parse_args()
+    if (args.input_file is None) == (args.batch_dir is None):
+        parser.error('specify either an input file or --batch-dir')
+    
+    # Parse warnings go to stderr so they never mix with JSON on stdout
+    logging.basicConfig(format='Warning: %(message)s')
+    if args.errors == 'skip':
+        logging.getLogger('hl7_parser').setLevel(logging.ERROR)
     
     try:
-        # Parse file
-        appointments = HL7FileParser.parse_file(args.input_file)
+        # Parse input, one message at a time as the output is written
+        if args.batch_dir:
+            appointments = HL7FileParser.iter_directory_appointments(args.batch_dir)
+        else:
+            appointments = HL7FileParser.iter_appointments(args.input_file, args.jobs)
         
-        # Convert to JSON
+        # Stream JSON output
         indent = 2 if args.pretty else None
-        appointments_dict = [app.to_dict() for app in appointments]
-        output_json = json.dumps(
-            appointments_dict,
-            indent=indent,
-            default=str
-        )
-        
-        # Output
         if args.output:
             with open(args.output, 'w') as f:
-                f.write(output_json)
-            print(f"Parsed {len(appointments)} appointments to {args.output}")
+                count = _write_json(appointments, f, indent)
+            print(f"Parsed {count} appointments to {args.output}")
         else:
-            print(output_json)
+            _write_json(appointments, sys.stdout, indent)
+            sys.stdout.write('\n')
         
         return 0
     
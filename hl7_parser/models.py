@@ -1,19 +1,55 @@
 """
 Data models for HL7 SIU appointment parsing.
 """
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, ClassVar, Iterator, List, Mapping, NamedTuple, Tuple
 import json
 
 
-@dataclass
-class Patient:
+class Delimiters(NamedTuple):
+    """HL7 delimiters declared in MSH.1 and MSH.2."""
+    field: str = '|'
+    component: str = '^'
+    subcomponent: str = '&'
+    repetition: str = '~'
+    escape: str = '\\'
+
+
+class _Model:
+    """
+    Base for the slotted data models.
+    
+    Models declare __slots__ instead of being dataclasses so instances carry
+    no per-instance __dict__; this provides the dataclass-style repr and
+    equality they would otherwise lose. Both iterate the public fields
+    listed in _fields rather than __slots__, which classes compiled with
+    mypyc do not expose.
+    """
+    __slots__: Tuple[str, ...] = ()
+    _fields: ClassVar[Tuple[str, ...]] = ()
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+
+class Patient(_Model):
     """Patient demographic information."""
-    id: Optional[str] = None
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
-    dob: Optional[str] = None
-    gender: Optional[str] = None
+    _fields = ('id', 'first_name', 'last_name', 'dob', 'gender')
+    __slots__ = _fields
+    
+    def __init__(self, id: Optional[str] = None, first_name: Optional[str] = None,
+                 last_name: Optional[str] = None, dob: Optional[str] = None,
+                 gender: Optional[str] = None):
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.dob = dob
+        self.gender = gender
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -26,11 +62,14 @@ class Patient:
         }
 
 
-@dataclass
-class Provider:
+class Provider(_Model):
     """Provider information."""
-    id: Optional[str] = None
-    name: Optional[str] = None
+    _fields = ('id', 'name')
+    __slots__ = _fields
+    
+    def __init__(self, id: Optional[str] = None, name: Optional[str] = None):
+        self.id = id
+        self.name = name
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -40,15 +79,22 @@ class Provider:
         }
 
 
-@dataclass
-class Appointment:
+class Appointment(_Model):
     """Appointment information."""
-    appointment_id: Optional[str] = None
-    appointment_datetime: Optional[str] = None
-    patient: Optional[Patient] = None
-    provider: Optional[Provider] = None
-    location: Optional[str] = None
-    reason: Optional[str] = None
+    _fields = ('appointment_id', 'appointment_datetime', 'patient', 'provider',
+               'location', 'reason')
+    __slots__ = _fields
+    
+    def __init__(self, appointment_id: Optional[str] = None,
+                 appointment_datetime: Optional[str] = None,
+                 patient: Optional[Patient] = None, provider: Optional[Provider] = None,
+                 location: Optional[str] = None, reason: Optional[str] = None):
+        self.appointment_id = appointment_id
+        self.appointment_datetime = appointment_datetime
+        self.patient = patient
+        self.provider = provider
+        self.location = location
+        self.reason = reason
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -66,23 +112,65 @@ class Appointment:
         return json.dumps(self.to_dict(), indent=indent, default=str)
 
 
-@dataclass
-class HL7Message:
+class SegmentMap(Mapping):
+    """
+    Segments of a message keyed by segment type, split into fields lazily.
+    
+    Segments are kept as raw strings and a segment type is only split into
+    fields the first time it is looked up, so segments that are never read
+    (e.g. OBX carrying base64 documents) are never split.
+    """
+    __slots__ = ('_raw_segments', '_field_delimiter', '_split_segments')
+    
+    def __init__(self, raw_segments: Dict[str, List[str]], field_delimiter: str):
+        self._raw_segments = raw_segments
+        self._field_delimiter = field_delimiter
+        self._split_segments: Dict[str, List[List[str]]] = {}
+    
+    def __getitem__(self, segment_type: str) -> List[List[str]]:
+        segments = self._split_segments.get(segment_type)
+        if segments is None:
+            delimiter = self._field_delimiter
+            segments = [segment.split(delimiter) for segment in self._raw_segments[segment_type]]
+            self._split_segments[segment_type] = segments
+        return segments
+    
+    def __contains__(self, segment_type: object) -> bool:
+        return segment_type in self._raw_segments
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_segments)
+    
+    def __len__(self) -> int:
+        return len(self._raw_segments)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class HL7Message(_Model):
     """Raw HL7 message with parsed segments."""
-    raw_message: str
-    segments: Dict[str, list] = field(default_factory=dict)
-    delimiters: Dict[str, str] = field(default_factory=lambda: {
-        'field': '|',
-        'component': '^',
-        'subcomponent': '&',
-        'repetition': '~',
-        'escape': '\\'
-    })
+    _fields = ('raw_message', 'segments', 'delimiters')
+    # _components is internal state, left out of repr and equality
+    __slots__ = _fields + ('_components',)
+    
+    def __init__(self, raw_message: str,
+                 segments: Optional[Mapping[str, List[List[str]]]] = None,
+                 delimiters: Delimiters = Delimiters()):
+        self.raw_message = raw_message
+        self.segments = segments if segments is not None else {}
+        self.delimiters = delimiters
+        # Component lists of fields already split by get_field, keyed by
+        # (segment type, field index); created on first use
+        self._components: Optional[Dict[Tuple[str, int], List[str]]] = None
     
     def get_field(self, segment_type: str, field_index: int, component_index: Optional[int] = None) -> Optional[str]:
         """
         Get a field value from a segment.
         
+        A field is split into components once, so reading several
+        components of the same field does not split it again.
+        
         Args:
             segment_type: Segment type (MSH, PID, etc.)
             field_index: Field index (1-based)
@@ -107,7 +195,13 @@ class HL7Message:
         field_value = segment[field_index]
         
         if component_index is not None and field_value:
-            components = field_value.split(self.delimiters['component'])
+            if self._components is None:
+                self._components = {}
+            key = (segment_type, field_index)
+            components = self._components.get(key)
+            if components is None:
+                components = field_value.split(self.delimiters.component)
+                self._components[key] = components
             if component_index < len(components):
                 return components[component_index]
         
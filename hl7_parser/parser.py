@@ -1,11 +1,476 @@
 """
 Main HL7 SIU message parser.
+
+Performance note: the parse path is string slicing, splitting and dict
+filling from start to finish. Numba only compiles numeric code in nopython
+mode and would run all of this in object mode with no speedup, so it is not
+used here. For compiled speed, build the modules with mypyc (see setup.py);
+the code also runs unchanged on PyPy.
 """
-import re
-from typing import List, Optional, Dict, Any
-from .models import HL7Message, Appointment, Patient, Provider
+import logging
+import mmap
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Deque, Iterable, Iterator, List, Optional, Dict, Any, Tuple, TypeVar, Union
+from .models import HL7Message, Delimiters, SegmentMap, Appointment, Patient, Provider
 from .exceptions import InvalidMessageError, HL7ParseError
-from .utils import parse_hl7_timestamp, parse_name, safe_split
+from .utils import parse_hl7_timestamp, parse_name_parts
+
+
+_log = logging.getLogger(__name__)
+
+
+_T = TypeVar('_T')
+
+
+# Segment types found in SIU messages, mapped to themselves so every parsed
+# message keys its segments with the same interned string objects and
+# lookups with literal keys match by identity
+_KNOWN_SEGMENT_TYPES = {segment_type: segment_type for segment_type in (
+    'MSH', 'EVN', 'SCH', 'TQ1', 'NTE', 'PID', 'PD1', 'PV1', 'PV2', 'OBX',
+    'DG1', 'RGS', 'AIS', 'AIG', 'AIL', 'AIP', 'NK1',
+)}
+
+
+# Delimiters of messages using the standard |^~\& encoding characters
+_DEFAULT_DELIMITERS = Delimiters()
+
+
+# ASCII characters str.strip treats as whitespace, for stripping raw
+# segments before they are decoded; non-ASCII whitespace such as NBSP is
+# only stripped once a segment is decoded
+_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+
+# Stand-ins with every field None for appointments without a patient or
+# provider, used when flattening appointments into columns
+_NO_PATIENT = Patient()
+_NO_PROVIDER = Provider()
+
+
+def _iter_segments(message: Any) -> Iterator[Any]:
+    """
+    Yield the non-empty segments of a message or file, in order.
+    
+    Segment boundaries are located with find instead of normalizing line
+    endings first, so the content is never copied as a whole. Fields are
+    not split here; SegmentMap splits a segment type on first access.
+    Works on both str and bytes content; it is typed as Any rather than
+    AnyStr because mypyc cannot compile constrained type variables.
+    
+    Args:
+        message: HL7 content with segments separated by \\r, \\n or \\r\\n
+    
+    Yields:
+        Raw segment strings
+    """
+    cr, lf = ('\r', '\n') if isinstance(message, str) else (b'\r', b'\n')
+    length = len(message)
+    next_cr = message.find(cr)
+    next_lf = message.find(lf)
+    start = 0
+    
+    while start < length:
+        # Refresh whichever terminator position has fallen behind
+        if next_cr != -1 and next_cr < start:
+            next_cr = message.find(cr, start)
+        if next_lf != -1 and next_lf < start:
+            next_lf = message.find(lf, start)
+        
+        if next_cr == -1:
+            end = length if next_lf == -1 else next_lf
+        elif next_lf == -1 or next_cr < next_lf:
+            end = next_cr
+        else:
+            end = next_lf
+        
+        if end > start:
+            yield message[start:end]
+        
+        start = end + 1
+
+
+def _iter_stream_segments(stream: BinaryIO, chunk_size: int = 65536) -> Iterator[bytes]:
+    """
+    Yield the non-empty segments of a binary stream, reading it in chunks.
+    
+    Used for files that cannot be memory-mapped, such as pipes, so only
+    the segments being scanned are held in memory rather than the whole
+    stream. A segment split across chunks is carried over until its
+    terminator arrives.
+    
+    Args:
+        stream: Binary stream of HL7 content
+        chunk_size: Number of bytes to read at a time
+    
+    Yields:
+        Raw segment bytes
+    """
+    # Chunks read since the last segment terminator
+    pending: List[bytes] = []
+    
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        
+        end = max(chunk.rfind(b'\r'), chunk.rfind(b'\n'))
+        if end == -1:
+            pending.append(chunk)
+            continue
+        
+        pending.append(chunk[:end])
+        yield from _iter_segments(b''.join(pending))
+        pending = [chunk[end + 1:]]
+    
+    yield from _iter_segments(b''.join(pending))
+
+
+def _iter_segment_groups(segments: Iterable[bytes]) -> Iterator[List[bytes]]:
+    """
+    Group the segments of raw file content by message.
+    
+    A new message starts at every MSH segment, so message boundaries fall
+    out of the same scan that finds the segments and each byte of the file
+    is only scanned once. Segments are stripped of surrounding ASCII
+    whitespace first, so indented or space-padded lines are still
+    recognised, and blank lines are dropped. Anything before the first MSH
+    segment is yielded as a group of its own.
+    
+    Args:
+        segments: Raw segments of the file, in order
+    
+    Yields:
+        List of raw segments of each message, in order, stripped of ASCII
+        whitespace
+    """
+    group: List[bytes] = []
+    
+    for segment in segments:
+        segment = segment.strip(_WHITESPACE)
+        if not segment:
+            continue
+        if segment[0] < 0x80:
+            is_msh = segment.startswith(b'MSH')
+        else:
+            # Leading non-ASCII whitespace is only recognised once decoded
+            is_msh = _decode(segment).lstrip().startswith('MSH')
+        if is_msh and group:
+            yield group
+            group = []
+        group.append(segment)
+    
+    if group:
+        yield group
+
+
+def _padded(values: List[str], width: int) -> List[str]:
+    """
+    Pad a field or component list with empty strings to at least width items.
+    
+    Lets extract_appointment index the positions it reads directly instead
+    of guarding every access with a length check.
+    """
+    if len(values) >= width:
+        return values
+    return values + [''] * (width - len(values))
+
+
+def _extract_sch_datetime(sch_fields: List[str], sch11: List[str], component: str) -> Optional[str]:
+    """
+    Extract the appointment datetime from a padded SCH segment.
+    
+    In HL7 SIU S12 the appointment datetime is typically SCH.11.4, but it
+    can also be in SCH.2.
+    
+    Args:
+        sch_fields: SCH fields, padded to at least 17
+        sch11: SCH.11 components, padded to at least 4
+        component: Component delimiter
+    
+    Returns:
+        ISO 8601 datetime, or None if not found
+    """
+    # SCH.11.4 is the datetime (component index 3, 0-based)
+    if sch11[3]:
+        return parse_hl7_timestamp(sch11[3])
+    
+    # If not found, try SCH.2 (index 2)
+    if sch_fields[2]:
+        components = _padded(sch_fields[2].split(component), 4)
+        # SCH.2.4 is often used for datetime (component index 3, 0-based)
+        if components[3]:
+            return parse_hl7_timestamp(components[3])
+        # Also check other components in SCH.2
+        for value in components:
+            if len(value) >= 8:  # Looks like a date
+                parsed_dt = parse_hl7_timestamp(value)
+                if parsed_dt:
+                    return parsed_dt
+    
+    return None
+
+
+def _extract_sch_provider(sch_fields: List[str], component: str) -> Optional[Provider]:
+    """
+    Extract the provider from a padded SCH segment, from SCH.16 or SCH.5.
+    
+    Args:
+        sch_fields: SCH fields, padded to at least 17
+        component: Component delimiter
+    
+    Returns:
+        Provider object, or None if neither field holds one
+    """
+    # First try SCH.16 (index 16) - per HL7 spec
+    if sch_fields[16]:
+        # Components are: Last^First^Middle^Suffix^ID
+        components = _padded(sch_fields[16].split(component, 5), 5)
+        
+        if any(components[:5]):
+            return Provider(
+                id=components[4] or None,
+                name=' '.join(filter(None, (components[1], components[2],
+                                            components[0], components[3]))) or None
+            )
+    
+    # If not found, try SCH.5 (index 5) - for compatibility with test data
+    # Only if it looks like a provider field (has components)
+    if component in sch_fields[5]:
+        # Format: ^Last^First^Title^ID
+        components = _padded(sch_fields[5].split(component, 5), 5)
+        return Provider(
+            id=components[4] or None,
+            name=' '.join(filter(None, (components[2], components[1], components[3]))) or None
+        )
+    
+    return None
+
+
+def _extract_pv1_provider(field: str, component: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract the provider ID and name from PV1.7.
+    
+    Args:
+        field: Non-empty PV1.7 value, formatted ^Last^First^Title^^^ID
+        component: Component delimiter
+    
+    Returns:
+        Tuple of (provider_id, provider_name), either of which may be None
+    """
+    components = _padded(field.split(component, 7), 7)
+    
+    # ID might be in different positions depending on format
+    # Try component 4 first (0-based index), some formats have
+    # more components before ID
+    provider_id = components[4] or components[6] or None
+    name = ' '.join(filter(None, (components[2], components[1], components[3]))) or None
+    return provider_id, name
+
+
+def _extract_patient(pid_fields: List[str]) -> Patient:
+    """
+    Extract patient information from a padded PID segment.
+    
+    Args:
+        pid_fields: PID fields, padded to at least 9
+    
+    Returns:
+        Patient object
+    """
+    patient = Patient()
+    
+    # Patient ID (PID.3) - index 3
+    patient.id = pid_fields[3] or None
+    
+    # Patient name (PID.5) - index 5
+    if pid_fields[5]:
+        patient.last_name, patient.first_name = parse_name_parts(pid_fields[5])
+    
+    # Date of birth (PID.7) - index 7
+    if pid_fields[7]:
+        patient.dob = parse_hl7_timestamp(pid_fields[7])
+    
+    # Gender (PID.8) - index 8
+    patient.gender = pid_fields[8] or None
+    
+    return patient
+
+
+def _is_siu_type(message_type: str) -> bool:
+    """
+    Check whether an MSH.9 value is an SIU message type.
+    
+    The prefix is compared in place rather than splitting MSH.9 into
+    message type and trigger event; trigger events other than S12 are
+    parsed anyway.
+    """
+    return message_type == 'SIU' or message_type.startswith('SIU^')
+
+
+def _wrap_parse_errors(parse: Callable[[], _T]) -> _T:
+    """
+    Run a parse step, reporting unexpected errors as HL7ParseError.
+    
+    HL7ParseError and its subclasses, such as InvalidMessageError, are
+    re-raised unchanged.
+    
+    Args:
+        parse: Parse step to run
+    
+    Returns:
+        Result of the parse step
+    
+    Raises:
+        HL7ParseError: If the parse step fails
+    """
+    try:
+        return parse()
+    except HL7ParseError:
+        raise
+    except Exception as e:
+        raise HL7ParseError(f"Error parsing HL7 message: {str(e)}") from e
+
+
+def _read_file(filepath: str) -> bytes:
+    """Read a whole file as bytes, reporting any I/O error as FileNotFoundError."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except IOError as e:
+        raise FileNotFoundError(f"Could not read file {filepath}: {str(e)}")
+
+
+def _decode(raw: bytes) -> str:
+    """Decode raw message text as UTF-8, falling back to latin-1 if that fails."""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def _iter_numbered_messages(content: Union[bytes, mmap.mmap, BinaryIO]) -> Iterator[Tuple[int, List[bytes]]]:
+    """
+    Yield the raw segments of each message in file content with its number.
+    
+    Segments and message boundaries are found in one scan of the raw bytes;
+    segments are only decoded as each message is parsed. The content is
+    closed once it has been scanned, unless it is a bytes object.
+    
+    Args:
+        content: Complete raw file content, or a binary stream to read it from
+    
+    Yields:
+        1-based message number and the raw segments of that message
+    """
+    if isinstance(content, (bytes, mmap.mmap)):
+        segments = _iter_segments(content)
+    else:
+        segments = _iter_stream_segments(content)
+    message_number = 0
+    
+    try:
+        for raw_segments in _iter_segment_groups(segments):
+            message_number += 1
+            yield message_number, raw_segments
+    finally:
+        if not isinstance(content, bytes):
+            content.close()
+
+
+def _iter_message_batches(messages: Iterator[Tuple[int, List[bytes]]],
+                          size: int = 64) -> Iterator[List[Tuple[int, List[bytes]]]]:
+    """Group numbered raw messages into lists of up to size messages."""
+    batch: List[Tuple[int, List[bytes]]] = []
+    for message in messages:
+        batch.append(message)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _parse_raw_message(message_number: int, raw_segments: List[bytes]) -> Optional[Appointment]:
+    """
+    Parse the raw segments of one message from a file.
+    
+    Non-SIU and malformed messages are skipped; other parse errors are
+    logged and skipped so the rest of the file is still parsed.
+    
+    Args:
+        message_number: 1-based position of the message in its file
+        raw_segments: Raw segments of the message, in order
+    
+    Returns:
+        Appointment object, or None if the message was skipped
+    """
+    # Skip malformed messages and other message types by MSH.9 before
+    # decoding the rest of the message
+    msh_segment = _decode(raw_segments[0]).strip()
+    if len(msh_segment) < 4 or not msh_segment.startswith('MSH'):
+        return None
+    msh_fields = msh_segment.split(msh_segment[3], 9)
+    if len(msh_fields) <= 8 or not _is_siu_type(msh_fields[8]):
+        return None
+    
+    # Strip any non-ASCII whitespace left around the decoded segments
+    segments = [msh_segment]
+    for raw_segment in raw_segments[1:]:
+        segment = _decode(raw_segment).strip()
+        if segment:
+            segments.append(segment)
+    try:
+        # The message type is already checked, and extract_appointment
+        # never reads MSH, so MSH is not split a second time
+        return _wrap_parse_errors(
+            lambda: HL7Parser.extract_appointment(HL7Parser.parse_segments(segments)))
+    except InvalidMessageError:
+        # Skip malformed messages
+        return None
+    except HL7ParseError as e:
+        # Log error but continue processing other messages
+        _log.warning("Error parsing message %d: %s", message_number, e)
+        return None
+
+
+def _parse_raw_messages(batch: List[Tuple[int, List[bytes]]]) -> List[Appointment]:
+    """Parse a batch of numbered raw messages; run on worker processes."""
+    appointments = []
+    for message_number, raw_segments in batch:
+        appointment = _parse_raw_message(message_number, raw_segments)
+        if appointment is not None:
+            appointments.append(appointment)
+    return appointments
+
+
+class _FileAppointments:
+    """
+    Iterator over the appointments of a file opened by iter_appointments.
+    
+    The parse generators close the file once it has been scanned, but a
+    generator that is never started never runs its finally block. This
+    wrapper owns the file instead and closes it when it is garbage
+    collected, whether or not iteration ever started. Generators compiled
+    with mypyc cannot be weakly referenced, so weakref.finalize on the
+    generator itself is not an option.
+    """
+    __slots__ = ('_content', '_appointments')
+    
+    def __init__(self, content: Union[mmap.mmap, BinaryIO], appointments: Iterator[Appointment]):
+        self._content = content
+        self._appointments = appointments
+    
+    def __iter__(self) -> '_FileAppointments':
+        return self
+    
+    def __next__(self) -> Appointment:
+        return next(self._appointments)
+    
+    def __del__(self) -> None:
+        self._content.close()
 
 
 class HL7Parser:
@@ -25,69 +490,96 @@ class HL7Parser:
         Raises:
             InvalidMessageError: If message is invalid
         """
-        if not raw_message or not raw_message.strip():
+        message = raw_message.strip() if raw_message else ''
+        if not message:
             raise InvalidMessageError("Empty message")
         
-        # Normalize line endings
-        message = raw_message.replace('\r\n', '\r').replace('\n', '\r')
+        # Reject input that cannot be HL7 before scanning it for segments;
+        # after strip, the message starts with its first segment
+        if not message.startswith('MSH'):
+            raise InvalidMessageError("Message must start with MSH segment")
+        
+        return HL7Parser.parse_segments(list(_iter_segments(message)), raw_message)
+    
+    @staticmethod
+    def parse_segments(segments: List[str], raw_message: Optional[str] = None) -> HL7Message:
+        """
+        Build a parsed HL7 message from its segments.
+        
+        Args:
+            segments: Raw segment strings of one message, in order
+            raw_message: Original message text; defaults to the segments
+                joined with \\r
         
-        # Split into segments
-        segments = message.strip().split('\r')
-        if not segments:
-            raise InvalidMessageError("No segments found")
+        Returns:
+            HL7Message object with parsed segments
         
+        Raises:
+            InvalidMessageError: If message is invalid
+        """
         # Parse MSH segment to get delimiters
-        if not segments[0].startswith('MSH'):
+        if not segments or not segments[0].startswith('MSH'):
             raise InvalidMessageError("Message must start with MSH segment")
         
-        # Parse delimiters from MSH segment
         msh_segment = segments[0]
         if len(msh_segment) < 4:
             raise InvalidMessageError("Invalid MSH segment")
         
         field_delimiter = msh_segment[3]  # MSH.1 is the field delimiter
-        delimiters = {
-            'field': field_delimiter,
-            'component': '^',  # Default, can be overridden by MSH.2
-            'subcomponent': '&',
-            'repetition': '~',
-            'escape': '\\'
-        }
-        
-        # Parse MSH.2 for encoding characters if present
-        if len(msh_segment) > 4 and msh_segment[4] == field_delimiter:
-            # MSH.2 contains component, repetition, escape, and subcomponent delimiters
-            encoding_chars = msh_segment[5:9]
-            if len(encoding_chars) >= 4:
-                delimiters['component'] = encoding_chars[0]
-                delimiters['repetition'] = encoding_chars[1]
-                delimiters['escape'] = encoding_chars[2]
-                delimiters['subcomponent'] = encoding_chars[3]
         
-        # Parse all segments
-        parsed_segments: Dict[str, List[List[str]]] = {}
+        if msh_segment.startswith('MSH|^~\\&'):
+            # Standard |^~\& delimiters, used by nearly every message, are
+            # recognised with one comparison and shared
+            delimiters = _DEFAULT_DELIMITERS
+        # Otherwise take the encoding characters straight from MSH when
+        # present, without slicing them out first
+        elif len(msh_segment) >= 9 and msh_segment[4] == field_delimiter:
+            # MSH.2 contains component, repetition, escape, and subcomponent delimiters
+            delimiters = Delimiters(
+                field=field_delimiter,
+                component=msh_segment[5],
+                subcomponent=msh_segment[8],
+                repetition=msh_segment[6],
+                escape=msh_segment[7]
+            )
+        elif field_delimiter == '|':
+            # Any other MSH.2 with the standard field delimiter
+            delimiters = _DEFAULT_DELIMITERS
+        else:
+            delimiters = Delimiters(field=field_delimiter)
         
+        # Group segments by type; fields are only split for the segment
+        # types that are actually read
+        raw_segments: Dict[str, List[str]] = {}
         for segment in segments:
-            if not segment:
-                continue
-            
-            # Extract segment type (first 3 characters)
             segment_type = segment[:3]
-            
-            # Split segment into fields
-            fields = segment.split(delimiters['field'])
-            
-            # Store segment
-            if segment_type not in parsed_segments:
-                parsed_segments[segment_type] = []
-            parsed_segments[segment_type].append(fields)
+            segment_type = _KNOWN_SEGMENT_TYPES.get(segment_type) or sys.intern(segment_type)
+            if segment_type not in raw_segments:
+                raw_segments[segment_type] = []
+            raw_segments[segment_type].append(segment)
         
         return HL7Message(
-            raw_message=raw_message,
-            segments=parsed_segments,
+            raw_message=raw_message if raw_message is not None else '\r'.join(segments),
+            segments=SegmentMap(raw_segments, field_delimiter),
             delimiters=delimiters
         )
     
+    @staticmethod
+    def is_siu_message(message: HL7Message) -> bool:
+        """
+        Check whether a parsed message is an SIU message, without raising.
+        
+        Args:
+            message: Parsed HL7 message
+        
+        Returns:
+            True if MSH.9 holds an SIU message type
+        """
+        msh_segments = message.segments.get('MSH')
+        if not msh_segments or len(msh_segments[0]) <= 8:
+            return False
+        return _is_siu_type(msh_segments[0][8])
+    
     @staticmethod
     def validate_siu_message(message: HL7Message) -> bool:
         """
@@ -102,6 +594,9 @@ class HL7Parser:
         Raises:
             InvalidMessageError: If not a valid SIU S12 message
         """
+        if HL7Parser.is_siu_message(message):
+            return True
+        
         # Check MSH segment exists
         if 'MSH' not in message.segments:
             raise InvalidMessageError("MSH segment missing")
@@ -114,19 +609,10 @@ class HL7Parser:
             raise InvalidMessageError("MSH segment missing message type field")
         
         message_type = msh_fields[8]
-        if '^' in message_type:
-            msg_type, trigger_event = message_type.split('^')[:2]
-        else:
-            msg_type = message_type
-        
-        if msg_type != 'SIU':
+        if not _is_siu_type(message_type):
+            msg_type = message_type.split('^', 1)[0]
             raise InvalidMessageError(f"Expected SIU message type, got {msg_type}")
         
-        # Check trigger event (optional)
-        if '^' in message_type and trigger_event != 'S12':
-            # We'll parse it anyway but log/warn about unexpected trigger
-            pass
-        
         return True
     
     @staticmethod
@@ -141,175 +627,80 @@ class HL7Parser:
             Appointment object with extracted data
         """
         appointment = Appointment()
+        component = message.delimiters.component
+        
+        # Read PV1 first: its provider and location override SCH, so the
+        # SCH fallbacks are only parsed where PV1 leaves them unset
+        pv1_provider = False
+        pv1_provider_id = pv1_provider_name = pv1_location = None
+        if 'PV1' in message.segments:
+            pv1_fields = _padded(message.segments['PV1'][0], 8)
+            
+            # Provider (PV1.7) - index 7
+            if pv1_fields[7]:
+                pv1_provider = True
+                pv1_provider_id, pv1_provider_name = _extract_pv1_provider(pv1_fields[7], component)
+            
+            # Location from PV1.3 - index 3
+            # PV1.3.1 is the location type (component index 0)
+            if pv1_fields[3]:
+                pv1_location = pv1_fields[3].split(component, 1)[0] or None
         
         # Extract from SCH segment
         if 'SCH' in message.segments:
-            sch_fields = message.segments['SCH'][0]
+            sch_fields = _padded(message.segments['SCH'][0], 17)
+            # SCH.11 holds both the datetime and the location; split it once
+            sch11 = _padded(sch_fields[11].split(component) if sch_fields[11] else [], 4)
             
             # Appointment ID (SCH.1) - index 1
-            if len(sch_fields) > 1 and sch_fields[1]:
-                appointment.appointment_id = sch_fields[1]
-            
-            # Appointment datetime
-            # In HL7 SIU S12, appointment datetime is typically in SCH.11 (field index 11)
-            # But it can also be in SCH.2 (field index 2)
-            datetime_found = False
-            
-            # Try SCH.11 first (index 11)
-            if len(sch_fields) > 11 and sch_fields[11]:
-                components = safe_split(sch_fields[11], message.delimiters['component'])
-                # SCH.11.4 is the datetime (component index 3, 0-based)
-                if len(components) > 3 and components[3]:
-                    appointment.appointment_datetime = parse_hl7_timestamp(components[3])
-                    datetime_found = True
-            
-            # If not found, try SCH.2 (index 2)
-            if not datetime_found and len(sch_fields) > 2 and sch_fields[2]:
-                components = safe_split(sch_fields[2], message.delimiters['component'])
-                # SCH.2.4 is often used for datetime (component index 3, 0-based)
-                if len(components) > 3 and components[3]:
-                    appointment.appointment_datetime = parse_hl7_timestamp(components[3])
-                    datetime_found = True
-                # Also check other components in SCH.2
-                elif not datetime_found:
-                    for component in components:
-                        if component and len(component) >= 8:  # Looks like a date
-                            parsed_dt = parse_hl7_timestamp(component)
-                            if parsed_dt:
-                                appointment.appointment_datetime = parsed_dt
-                                datetime_found = True
-                                break
+            appointment.appointment_id = sch_fields[1] or None
+            appointment.appointment_datetime = _extract_sch_datetime(sch_fields, sch11, component)
             
             # Reason (SCH.7 in spec, but test has it at SCH.3) - try both locations
-            # First try SCH.7 (index 7)
-            if len(sch_fields) > 7 and sch_fields[7]:
-                appointment.reason = sch_fields[7]
-            # If not found, try SCH.3 (index 3) - for compatibility with test data
-            elif len(sch_fields) > 3 and sch_fields[3]:
-                appointment.reason = sch_fields[3]
-            
-            # Location - check multiple possible fields
-            # Try SCH.11.3 first (index 11, component 2)
-            if len(sch_fields) > 11 and sch_fields[11]:
-                components = safe_split(sch_fields[11], message.delimiters['component'])
-                if len(components) > 2 and components[2]:
-                    appointment.location = components[2]
+            appointment.reason = sch_fields[7] or sch_fields[3] or None
             
-            # If not found, try SCH.4 (index 4, component 2)
-            if not appointment.location and len(sch_fields) > 4 and sch_fields[4]:
-                components = safe_split(sch_fields[4], message.delimiters['component'])
-                if len(components) > 2 and components[2]:
-                    appointment.location = components[2]
+            # Location - SCH.11.3 first (index 11, component 2), then SCH.4.3
+            if not pv1_location:
+                appointment.location = sch11[2] or None
+                if not appointment.location and sch_fields[4]:
+                    appointment.location = _padded(sch_fields[4].split(component), 3)[2] or None
             
-            # Provider - try multiple locations
-            # First try SCH.16 (index 16) - per HL7 spec
-            if len(sch_fields) > 16 and sch_fields[16]:
-                components = safe_split(sch_fields[16], message.delimiters['component'])
-                provider_id = components[4] if len(components) > 4 and components[4] else None
-                
-                if provider_id or any(c for c in components[:4] if c):
-                    provider = Provider()
-                    provider.id = provider_id
-                    
-                    # Parse provider name from components
-                    # Components are: Last^First^Middle^Suffix^ID
-                    last_name = components[0] if len(components) > 0 and components[0] else None
-                    first_name = components[1] if len(components) > 1 and components[1] else None
-                    middle_name = components[2] if len(components) > 2 and components[2] else None
-                    suffix = components[3] if len(components) > 3 and components[3] else None
-                    
-                    name_parts = [p for p in [first_name, middle_name, last_name, suffix] if p]
-                    provider.name = ' '.join(name_parts) if name_parts else None
-                    
-                    appointment.provider = provider
-            
-            # If not found, try SCH.5 (index 5) - for compatibility with test data
-            if not appointment.provider and len(sch_fields) > 5 and sch_fields[5]:
-                components = safe_split(sch_fields[5], message.delimiters['component'])
-                # Check if this looks like a provider field (has components)
-                if len(components) > 1:
-                    # Format: ^Last^First^Title^ID
-                    provider = Provider()
-                    
-                    last_name = components[1] if len(components) > 1 and components[1] else None
-                    first_name = components[2] if len(components) > 2 and components[2] else None
-                    title = components[3] if len(components) > 3 and components[3] else None
-                    provider_id = components[4] if len(components) > 4 and components[4] else None
-                    
-                    provider.id = provider_id
-                    
-                    name_parts = [p for p in [first_name, last_name, title] if p]
-                    provider.name = ' '.join(name_parts) if name_parts else None
-                    
-                    appointment.provider = provider
+            # Provider, unless PV1 gives both the ID and the name, which
+            # would replace anything found in SCH
+            if not (pv1_provider_id and pv1_provider_name):
+                appointment.provider = _extract_sch_provider(sch_fields, component)
         
         # Extract patient information from PID segment
         if 'PID' in message.segments:
-            pid_fields = message.segments['PID'][0]
-            patient = Patient()
-            
-            # Patient ID (PID.3) - index 3
-            if len(pid_fields) > 3 and pid_fields[3]:
-                patient.id = pid_fields[3]
-            
-            # Patient name (PID.5) - index 5
-            if len(pid_fields) > 5 and pid_fields[5]:
-                last_name, first_name, _ = parse_name(pid_fields[5])
-                patient.last_name = last_name
-                patient.first_name = first_name
-            
-            # Date of birth (PID.7) - index 7
-            if len(pid_fields) > 7 and pid_fields[7]:
-                patient.dob = parse_hl7_timestamp(pid_fields[7])
-            
-            # Gender (PID.8) - index 8
-            if len(pid_fields) > 8 and pid_fields[8]:
-                patient.gender = pid_fields[8]
-            
-            appointment.patient = patient
+            appointment.patient = _extract_patient(_padded(message.segments['PID'][0], 9))
         
-        # Extract provider from PV1 segment (overrides SCH if present)
-        if 'PV1' in message.segments:
-            pv1_fields = message.segments['PV1'][0]
-            
-            # Provider (PV1.7) - index 7
-            if len(pv1_fields) > 7 and pv1_fields[7]:
-                components = safe_split(pv1_fields[7], message.delimiters['component'])
-                
-                # Provider format: ^Last^First^Title^^^ID
-                provider = appointment.provider or Provider()
-                
-                last_name = components[1] if len(components) > 1 and components[1] else None
-                first_name = components[2] if len(components) > 2 and components[2] else None
-                title = components[3] if len(components) > 3 and components[3] else None
-                
-                # ID might be in different positions depending on format
-                # Try component 4 first (0-based index)
-                provider_id = None
-                if len(components) > 4 and components[4]:
-                    provider_id = components[4]
-                # Some formats have more components before ID
-                elif len(components) > 6 and components[6]:
-                    provider_id = components[6]
-                
-                if provider_id:
-                    provider.id = provider_id
-                
-                if last_name or first_name or title:
-                    name_parts = [p for p in [first_name, last_name, title] if p]
-                    provider.name = ' '.join(name_parts) if name_parts else None
-                
-                appointment.provider = provider
-            
-            # Location from PV1.3 (overrides SCH if present) - index 3
-            if len(pv1_fields) > 3 and pv1_fields[3]:
-                components = safe_split(pv1_fields[3], message.delimiters['component'])
-                # PV1.3.1 is the location type (component index 0)
-                if len(components) > 0 and components[0]:
-                    appointment.location = components[0]
+        # Apply the PV1 provider details over any found in SCH
+        if pv1_provider:
+            provider = appointment.provider or Provider()
+            if pv1_provider_id:
+                provider.id = pv1_provider_id
+            if pv1_provider_name:
+                provider.name = pv1_provider_name
+            appointment.provider = provider
+        
+        if pv1_location:
+            appointment.location = pv1_location
         
         return appointment
     
+    @staticmethod
+    def _extract_siu_appointment(message: HL7Message) -> Appointment:
+        """Validate that a parsed message is SIU and extract its appointment."""
+        HL7Parser.validate_siu_message(message)
+        return HL7Parser.extract_appointment(message)
+    
+    @staticmethod
+    def _try_extract_siu_appointment(message: HL7Message) -> Optional[Appointment]:
+        """Extract the appointment of a parsed SIU message, or None for other types."""
+        if not HL7Parser.is_siu_message(message):
+            return None
+        return HL7Parser.extract_appointment(message)
+    
     @staticmethod
     def parse_siu_message(raw_message: str) -> Appointment:
         """
@@ -325,22 +716,29 @@ class HL7Parser:
             InvalidMessageError: If not a valid SIU S12 message
             HL7ParseError: For other parsing errors
         """
-        try:
-            # Parse raw message
-            message = HL7Parser.parse_message(raw_message)
-            
-            # Validate it's an SIU message
-            HL7Parser.validate_siu_message(message)
-            
-            # Extract appointment data
-            appointment = HL7Parser.extract_appointment(message)
-            
-            return appointment
+        return _wrap_parse_errors(
+            lambda: HL7Parser._extract_siu_appointment(HL7Parser.parse_message(raw_message)))
+    
+    @staticmethod
+    def try_parse_siu_message(raw_message: str) -> Optional[Appointment]:
+        """
+        Parse a single message, returning None if it is not an SIU message.
+        
+        Unlike parse_siu_message, a well-formed message of another type is
+        skipped without raising and catching an exception.
+        
+        Args:
+            raw_message: Raw HL7 message string
+        
+        Returns:
+            Appointment object, or None for non-SIU messages
         
-        except Exception as e:
-            if isinstance(e, HL7ParseError):
-                raise
-            raise HL7ParseError(f"Error parsing HL7 message: {str(e)}") from e
+        Raises:
+            InvalidMessageError: If the message is malformed
+            HL7ParseError: For other parsing errors
+        """
+        return _wrap_parse_errors(
+            lambda: HL7Parser._try_extract_siu_appointment(HL7Parser.parse_message(raw_message)))
 
 
 class HL7FileParser:
@@ -357,22 +755,22 @@ class HL7FileParser:
         Returns:
             List of individual HL7 messages
         """
-        # Normalize line endings
-        content = file_content.replace('\r\n', '\r').replace('\n', '\r')
-        
-        # Split by MSH segments (each message starts with MSH)
         messages = []
-        current_message = []
-        
-        for line in content.split('\r'):
+        current_message: List[str] = []
+        
+        # Segments are split without normalizing line endings first; each
+        # line is stripped so indented and space-padded segments still count.
+        # Since every line is stripped and rejoined, seeking MSH boundaries
+        # with find would not skip any work. File parsing does not come
+        # through here; it groups raw segments with _iter_segment_groups.
+        for line in _iter_segments(file_content):
             line = line.strip()
             if not line:
                 continue
             
-            if line.startswith('MSH'):
-                if current_message:
-                    messages.append('\r'.join(current_message))
-                    current_message = []
+            if line.startswith('MSH') and current_message:
+                messages.append('\r'.join(current_message))
+                current_message = []
             
             current_message.append(line)
         
@@ -382,45 +780,220 @@ class HL7FileParser:
         return messages
     
     @staticmethod
-    def parse_file(filepath: str) -> List[Appointment]:
+    def iter_appointments(filepath: str, processes: int = 1) -> Iterator[Appointment]:
         """
-        Parse an HL7 file containing one or more SIU messages.
+        Lazily parse an HL7 file containing one or more SIU messages.
+        
+        The file is opened and memory-mapped when this is called, so a
+        missing file is reported immediately, but each message is only
+        decoded and parsed as the returned iterator reaches it. Files that
+        cannot be mapped, such as pipes, are read in chunks as they are
+        parsed.
+        
+        With processes above 1, messages are parsed in batches on that many
+        worker processes, keeping the file's order. Files with no more than
+        one batch of messages are still parsed in this process.
         
         Args:
             filepath: Path to HL7 file
+            processes: Number of worker processes to parse messages on
         
         Returns:
-            List of Appointment objects
+            Iterator over Appointment objects
         
         Raises:
             FileNotFoundError: If file doesn't exist
-            HL7ParseError: For parsing errors
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try with latin-1 encoding if utf-8 fails
-            with open(filepath, 'r', encoding='latin-1') as f:
-                content = f.read()
+            f = open(filepath, 'rb')
         except IOError as e:
             raise FileNotFoundError(f"Could not read file {filepath}: {str(e)}")
         
-        # Split into individual messages
-        raw_messages = HL7FileParser.split_messages(content)
+        content: Union[bytes, mmap.mmap, BinaryIO]
+        try:
+            # Map the file instead of reading it so boundary scanning
+            # works on the page cache without a full in-memory copy
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and non-regular files such as pipes cannot be
+            # mapped; read those in chunks as they are parsed instead
+            content = f
+        else:
+            f.close()
+        
+        if processes > 1:
+            appointments = HL7FileParser._iter_content_appointments_parallel(content, processes)
+        else:
+            appointments = HL7FileParser._iter_content_appointments(content)
+        return _FileAppointments(content, appointments)
+    
+    @staticmethod
+    def _iter_content_appointments(content: Union[bytes, mmap.mmap, BinaryIO]) -> Iterator[Appointment]:
+        """Yield an appointment for each SIU message in raw file content or a stream."""
+        for message_number, raw_segments in _iter_numbered_messages(content):
+            appointment = _parse_raw_message(message_number, raw_segments)
+            if appointment is not None:
+                yield appointment
+    
+    @staticmethod
+    def _iter_content_appointments_parallel(content: Union[bytes, mmap.mmap, BinaryIO],
+                                            processes: int) -> Iterator[Appointment]:
+        """Yield the appointments of raw file content parsed on worker processes."""
+        batches = _iter_message_batches(_iter_numbered_messages(content))
+        first_batch = next(batches, None)
+        second_batch = next(batches, None)
+        if first_batch is None:
+            return
+        if second_batch is None:
+            # A pool costs more to start than one batch takes to parse
+            yield from _parse_raw_messages(first_batch)
+            return
+        
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            # Keep a bounded number of batches in flight so a large file is
+            # not held in memory all at once
+            pending: Deque['Future[List[Appointment]]'] = deque([
+                executor.submit(_parse_raw_messages, first_batch),
+                executor.submit(_parse_raw_messages, second_batch),
+            ])
+            for batch in batches:
+                if len(pending) >= 2 * processes:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(_parse_raw_messages, batch))
+            
+            while pending:
+                yield from pending.popleft().result()
+    
+    @staticmethod
+    def iter_directory_appointments(dirpath: str, max_pending: int = 32) -> Iterator[Appointment]:
+        """
+        Lazily parse every HL7 file in a directory, in file name order.
         
-        appointments = []
+        Files are read on a thread pool up to max_pending files ahead of the
+        one being parsed, so reading upcoming files overlaps with parsing.
+        Hidden files and subdirectories are skipped, and files that cannot
+        be read are logged and skipped.
         
-        for i, raw_message in enumerate(raw_messages):
-            try:
-                appointment = HL7Parser.parse_siu_message(raw_message)
-                appointments.append(appointment)
-            except InvalidMessageError:
-                # Skip non-SIU messages
-                continue
-            except HL7ParseError as e:
-                # Log error but continue processing other messages
-                print(f"Warning: Error parsing message {i+1}: {str(e)}")
-                continue
+        Args:
+            dirpath: Path to a directory of HL7 files
+            max_pending: Maximum number of file reads in flight
+        
+        Returns:
+            Iterator over Appointment objects from all files
+        
+        Raises:
+            FileNotFoundError: If the directory doesn't exist
+        """
+        filepaths = sorted(
+            entry.path for entry in os.scandir(dirpath)
+            if entry.is_file() and not entry.name.startswith('.')
+        )
+        return HL7FileParser._iter_files_appointments(filepaths, max_pending)
+    
+    @staticmethod
+    def _iter_files_appointments(filepaths: Iterable[str], max_pending: int) -> Iterator[Appointment]:
+        """Yield appointments from files read ahead on a thread pool, skipping unreadable files."""
+        filepaths = iter(filepaths)
+        
+        with ThreadPoolExecutor() as executor:
+            pending: Deque['Future[bytes]'] = deque()
+            for filepath in filepaths:
+                pending.append(executor.submit(_read_file, filepath))
+                if len(pending) >= max_pending:
+                    break
+            
+            while pending:
+                read = pending.popleft()
+                
+                # Keep the read-ahead window full before parsing this file
+                next_path = next(filepaths, None)
+                if next_path is not None:
+                    pending.append(executor.submit(_read_file, next_path))
+                
+                try:
+                    content = read.result()
+                except FileNotFoundError as e:
+                    # Log error but continue with the other files
+                    _log.warning("%s", e)
+                    continue
+                
+                yield from HL7FileParser._iter_content_appointments(content)
+    
+    @staticmethod
+    def parse_file(filepath: str, processes: int = 1) -> List[Appointment]:
+        """
+        Parse an HL7 file containing one or more SIU messages.
+        
+        Args:
+            filepath: Path to HL7 file
+            processes: Number of worker processes to parse messages on
+        
+        Returns:
+            List of Appointment objects
+        
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            HL7ParseError: For parsing errors
+        """
+        return list(HL7FileParser.iter_appointments(filepath, processes))
+    
+    @staticmethod
+    def parse_string(content: str) -> List[Appointment]:
+        """
+        Parse HL7 file content already held in a string.
+        
+        Messages are found, skipped and reported exactly as parse_file does
+        for a file with the same content.
+        
+        Args:
+            content: Content of an HL7 file with one or more SIU messages
+        
+        Returns:
+            List of Appointment objects
+        """
+        return list(HL7FileParser._iter_content_appointments(content.encode('utf-8')))
+    
+    @staticmethod
+    def parse_file_columns(filepath: str, processes: int = 1) -> Dict[str, List[Optional[str]]]:
+        """
+        Parse an HL7 file into one list per appointment field.
+        
+        A column layout for batch consumers that scan a few fields over many
+        appointments; each list can be handed to e.g. numpy.asarray as is.
+        Nested patient and provider fields are flattened with a prefix and
+        are None for appointments without a patient or provider.
+        
+        Args:
+            filepath: Path to HL7 file
+            processes: Number of worker processes to parse messages on
+        
+        Returns:
+            Dictionary mapping field names to lists of values, in file order
+        
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        columns: Dict[str, List[Optional[str]]] = {name: [] for name in (
+            'appointment_id', 'appointment_datetime', 'location', 'reason',
+            'patient_id', 'patient_first_name', 'patient_last_name', 'patient_dob',
+            'patient_gender', 'provider_id', 'provider_name',
+        )}
+        
+        for appointment in HL7FileParser.iter_appointments(filepath, processes):
+            columns['appointment_id'].append(appointment.appointment_id)
+            columns['appointment_datetime'].append(appointment.appointment_datetime)
+            columns['location'].append(appointment.location)
+            columns['reason'].append(appointment.reason)
+            
+            patient = appointment.patient or _NO_PATIENT
+            columns['patient_id'].append(patient.id)
+            columns['patient_first_name'].append(patient.first_name)
+            columns['patient_last_name'].append(patient.last_name)
+            columns['patient_dob'].append(patient.dob)
+            columns['patient_gender'].append(patient.gender)
+            
+            provider = appointment.provider or _NO_PROVIDER
+            columns['provider_id'].append(provider.id)
+            columns['provider_name'].append(provider.name)
         
-        return appointments
\ No newline at end of file
+        return columns
@@ -3,7 +3,7 @@ Utility functions for HL7 parsing.
 """
 from typing import Optional, Tuple
 from datetime import datetime
-import re
+import functools
 
 
 def parse_hl7_timestamp(hl7_timestamp: str) -> Optional[str]:
@@ -22,59 +22,70 @@ def parse_hl7_timestamp(hl7_timestamp: str) -> Optional[str]:
     Returns:
         ISO 8601 formatted string or None if invalid
     """
-    if not hl7_timestamp or not hl7_timestamp.strip():
+    if not hl7_timestamp:
         return None
+    return _parse_hl7_timestamp_cached(hl7_timestamp)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_hl7_timestamp_cached(hl7_timestamp: str) -> Optional[str]:
+    """
+    Convert a non-empty HL7 timestamp, memoized.
     
+    Messages in a batch repeat the same timestamps (send times, shared
+    appointment slots, dates of birth), so each distinct value is only
+    converted once. Long-running services can release the cache with
+    _parse_hl7_timestamp_cached.cache_clear().
+    """
     timestamp = hl7_timestamp.strip()
+    if not timestamp:
+        return None
     
-    # Handle timezone offset
+    # Handle a trailing +/-ZZZZ timezone offset, checked by hand since most
+    # timestamps carry none and a regex search costs more than the check
     timezone_offset = None
-    tz_match = re.search(r'([+-]\d{4})$', timestamp)
-    if tz_match:
-        timezone_offset = tz_match.group(1)
+    if len(timestamp) >= 5 and timestamp[-5] in '+-' and timestamp[-4:].isdecimal():
+        timezone_offset = timestamp[-5:]
         timestamp = timestamp[:-5]  # Remove timezone offset
     
-    # Determine format based on length
-    timestamp_len = len(timestamp)
+    # Slice the digits straight into integers; strptime would re-parse the
+    # format string on every call. Each format is a prefix of
+    # YYYYMMDDHHMMSS, so the length is rounded down to a whole field
+    width = min(len(timestamp), 14) // 2 * 2
+    if width < 4:
+        return None
+    
+    digits = timestamp[:width]
+    if width >= 8 and digits[6] == ' ' and digits[7] != '0':
+        # strptime accepted a space-padded day, so keep accepting it
+        digits = digits[:6] + '0' + digits[7:]
+    if not (digits.isdigit() and digits.isascii()):
+        return None
+    
+    year = int(digits[0:4])
+    month = int(digits[4:6]) if width >= 6 else 1  # YYYY defaults to January
+    day = int(digits[6:8]) if width >= 8 else 1
+    hour = int(digits[8:10]) if width >= 10 else 0
+    minute = int(digits[10:12]) if width >= 12 else 0
+    second = int(digits[12:14]) if width >= 14 else 0
     
     try:
-        if timestamp_len >= 14:  # YYYYMMDDHHMMSS
-            dt = datetime.strptime(timestamp[:14], '%Y%m%d%H%M%S')
-        elif timestamp_len >= 12:  # YYYYMMDDHHMM
-            dt = datetime.strptime(timestamp[:12], '%Y%m%d%H%M')
-        elif timestamp_len >= 10:  # YYYYMMDDHH
-            dt = datetime.strptime(timestamp[:10], '%Y%m%d%H')
-        elif timestamp_len >= 8:  # YYYYMMDD
-            dt = datetime.strptime(timestamp[:8], '%Y%m%d')
-        elif timestamp_len >= 6:  # YYYYMM
-            dt = datetime.strptime(timestamp[:6] + '01', '%Y%m%d')
-        elif timestamp_len >= 4:  # YYYY
-            dt = datetime.strptime(timestamp[:4] + '0101', '%Y%m%d')
-        else:
-            return None
-        
-        # Format as ISO 8601
-        if timestamp_len >= 14:
-            iso_format = dt.isoformat()
-        elif timestamp_len >= 12:
-            iso_format = dt.isoformat()
-        elif timestamp_len >= 10:
-            iso_format = dt.isoformat()
-        elif timestamp_len >= 8:
-            iso_format = dt.date().isoformat() + "T00:00:00"
-        else:
-            iso_format = dt.date().isoformat() + "T00:00:00"
-        
-        # Add timezone if provided
-        if timezone_offset:
-            # Format as ±HH:MM
-            hours = timezone_offset[1:3]
-            minutes = timezone_offset[3:5]
-            iso_format += f"{timezone_offset[0]}{hours}:{minutes}"
-        
-        return iso_format
+        # Constructing a datetime validates the ranges, including leap days
+        datetime(year, month, day, hour, minute, second)
     except ValueError:
         return None
+    
+    # Format as ISO 8601
+    iso_format = f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}"
+    
+    # Add timezone if provided
+    if timezone_offset:
+        # Format as ±HH:MM
+        hours = timezone_offset[1:3]
+        minutes = timezone_offset[3:5]
+        iso_format += f"{timezone_offset[0]}{hours}:{minutes}"
+    
+    return iso_format
 
 
 def parse_name(hl7_name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
@@ -100,24 +111,31 @@ def parse_name(hl7_name: str) -> Tuple[Optional[str], Optional[str], Optional[st
     suffix = components[3] if len(components) > 3 and components[3] else None
     prefix = components[4] if len(components) > 4 and components[4] else None
     
-    # Construct full name
-    name_parts = []
-    if prefix:
-        name_parts.append(prefix)
-    if first_name:
-        name_parts.append(first_name)
-    if middle_name:
-        name_parts.append(middle_name)
-    if last_name:
-        name_parts.append(last_name)
-    if suffix:
-        name_parts.append(suffix)
-    
-    full_name = ' '.join(name_parts) if name_parts else None
+    # Construct full name from the non-empty parts
+    full_name = ' '.join(filter(None, (prefix, first_name, middle_name, last_name, suffix))) or None
     
     return last_name, first_name, full_name
 
 
+def parse_name_parts(hl7_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Parse the last and first name out of an HL7 name field.
+    
+    Cheaper than parse_name when the full name is not needed: only the
+    first two components are cut out and the rest of the field is never
+    scanned.
+    
+    Args:
+        hl7_name: HL7 formatted name string
+    
+    Returns:
+        Tuple of (last_name, first_name)
+    """
+    last_name, _, rest = hl7_name.partition('^')
+    first_name = rest.partition('^')[0]
+    return last_name or None, first_name or None
+
+
 def safe_split(text: str, delimiter: str, maxsplit: int = -1) -> list:
     """
     Safely split text by delimiter, handling None and empty strings.
@@ -130,6 +148,4 @@ def safe_split(text: str, delimiter: str, maxsplit: int = -1) -> list:
     Returns:
         List of split parts
     """
-    if not text:
-        return []
-    return text.split(delimiter, maxsplit)
\ No newline at end of file
+    return text.split(delimiter, maxsplit) if text else []
\ No newline at end of file
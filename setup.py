@@ -1,8 +1,29 @@
 """
 Setup script for HL7 parser.
 """
+import os
+
 from setuptools import setup, find_packages
 
+# Set HL7_PARSER_USE_MYPYC=1 to compile the parsing modules to C extensions
+# with mypyc; the default install stays pure Python
+ext_modules = []
+if os.environ.get("HL7_PARSER_USE_MYPYC") == "1":
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        raise SystemExit(
+            "HL7_PARSER_USE_MYPYC=1 requires mypy in the build environment; "
+            "install mypy, setuptools and wheel, then build with "
+            "pip install --no-build-isolation ."
+        )
+
+    ext_modules = mypycify([
+        "hl7_parser/models.py",
+        "hl7_parser/parser.py",
+        "hl7_parser/utils.py",
+    ])
+
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
@@ -15,6 +36,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Healthcare Industry",
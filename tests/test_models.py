@@ -0,0 +1,48 @@
+"""
+Unit tests for HL7 data models.
+"""
+import unittest
+from hl7_parser.models import HL7Message, SegmentMap
+
+
+class TestSegmentMap(unittest.TestCase):
+    
+    def test_segments_split_on_access(self):
+        """Test that segments are only split into fields when looked up."""
+        segments = SegmentMap({
+            'PID': ['PID|||P001||Doe^John'],
+            'OBX': ['OBX|1|ED|||QUJD'],
+        }, '|')
+        
+        self.assertIn('OBX', segments)
+        self.assertEqual(segments['PID'], [['PID', '', '', 'P001', '', 'Doe^John']])
+        self.assertNotIn('OBX', segments._split_segments)
+        self.assertEqual(sorted(segments), ['OBX', 'PID'])
+    
+    def test_missing_segment(self):
+        """Test lookups of a segment type that is not present."""
+        segments = SegmentMap({}, '|')
+        
+        self.assertNotIn('SCH', segments)
+        self.assertIsNone(segments.get('SCH'))
+        with self.assertRaises(KeyError):
+            segments['SCH']
+
+
+class TestHL7Message(unittest.TestCase):
+    
+    def test_get_field_components(self):
+        """Test reading several components of one field."""
+        message = HL7Message('PID|||P001||Doe^John', SegmentMap({
+            'PID': ['PID|||P001||Doe^John'],
+        }, '|'))
+        
+        self.assertEqual(message.get_field('PID', 5, 0), 'Doe')
+        self.assertEqual(message.get_field('PID', 5, 1), 'John')
+        self.assertEqual(message.get_field('PID', 3), 'P001')
+        self.assertIsNone(message.get_field('SCH', 1))
+        self.assertEqual(message, HL7Message(message.raw_message, message.segments))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,13 @@
 """
 Unit tests for HL7 parser.
 """
+import gc
+import io
 import unittest
+import warnings
 import tempfile
 import os
-from hl7_parser.parser import HL7Parser, HL7FileParser
+from hl7_parser.parser import HL7Parser, HL7FileParser, _iter_segments, _iter_stream_segments
 from hl7_parser.exceptions import InvalidMessageError, HL7ParseError
 
 
@@ -43,6 +46,42 @@ PV1|1|O|OPD^203||||^Smith^Jane^MD|||REF123"""
         self.assertEqual(appointment.provider.id, "D67890")
         self.assertEqual(appointment.provider.name, "Jane Smith MD")
     
+    def test_pv1_provider_name_only(self):
+        """Test a PV1.7 name without an ID keeps the SCH.16 provider ID."""
+        hl7_message = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG007|P|2.5
+SCH|007|^^^20250502100000||||||||||||||Jones^Bob^Q^Jr^D111
+PV1|1|O|OPD||||^Brown^Al^Dr"""
+        
+        appointment = HL7Parser.parse_siu_message(hl7_message)
+        self.assertEqual(appointment.provider.id, "D111")
+        self.assertEqual(appointment.provider.name, "Al Brown Dr")
+    
+    def test_pv1_provider_id_only(self):
+        """Test a PV1.7 ID without a name keeps the SCH.16 provider name."""
+        hl7_message = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG008|P|2.5
+SCH|008|^^^20250502100000||||||||||||||Jones^Bob^Q^Jr^D111
+PV1|1|O|OPD||||^^^^D999"""
+        
+        appointment = HL7Parser.parse_siu_message(hl7_message)
+        self.assertEqual(appointment.provider.id, "D999")
+        self.assertEqual(appointment.provider.name, "Bob Q Jones Jr")
+    
+    def test_location_falls_back_to_sch(self):
+        """Test an empty PV1.3 falls back to SCH.11.3, then SCH.4.3."""
+        hl7_message = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG009|P|2.5
+SCH|009|||^^Room 4|||||||^^Room 9^20250502100000
+PV1|1|O|||||^Brown^Al^Dr^D222"""
+        
+        appointment = HL7Parser.parse_siu_message(hl7_message)
+        self.assertEqual(appointment.location, "Room 9")
+        
+        hl7_message = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG010|P|2.5
+SCH|010|||^^Room 4
+PV1|1|O|||||^Brown^Al^Dr^D222"""
+        
+        appointment = HL7Parser.parse_siu_message(hl7_message)
+        self.assertEqual(appointment.location, "Room 4")
+    
     def test_missing_segments(self):
         """Test parsing message with missing segments."""
         hl7_message = r"""MSH|^~\&|SYSTEM_A||SYSTEM_B||20250502090000||SIU^S12|MSG002|P|2.5
@@ -72,6 +111,17 @@ PID|||P67890||Smith^Jane"""
         with self.assertRaises(InvalidMessageError):
             HL7Parser.parse_siu_message(hl7_message)
     
+    def test_try_parse_wrong_message_type(self):
+        """Test that try_parse_siu_message skips non-SIU messages without raising."""
+        adt_message = r"""MSH|^~\&|SYSTEM_A|FAC_A|SYSTEM_B|FAC_B|20250502090000||ADT^A01|MSG003|P|2.5"""
+        siu_message = r"""MSH|^~\&|SYSTEM_A|FAC_A|SYSTEM_B|FAC_B|20250502090000||SIU^S12|MSG004|P|2.5
+SCH|004|^^^20250502100000"""
+        
+        self.assertIsNone(HL7Parser.try_parse_siu_message(adt_message))
+        self.assertEqual(HL7Parser.try_parse_siu_message(siu_message).appointment_id, "004")
+        with self.assertRaises(InvalidMessageError):
+            HL7Parser.try_parse_siu_message("Not an HL7 message")
+    
     def test_malformed_message(self):
         """Test parsing malformed message."""
         hl7_message = """Not an HL7 message"""
@@ -135,25 +185,16 @@ MSH|^~\&|SYS|FAC|SYS|FAC|20250502090001||SIU^S12|MSG002|P|2.5
 PID|||P002||Smith^Jane||19900315|F
 SCH|002|^^^20250502110000^^60"""
         
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.hl7', delete=False) as f:
-            f.write(file_content)
-            temp_file = f.name
+        appointments = HL7FileParser.parse_string(file_content)
+        self.assertEqual(len(appointments), 2)
         
-        try:
-            appointments = HL7FileParser.parse_file(temp_file)
-            self.assertEqual(len(appointments), 2)
-            
-            self.assertEqual(appointments[0].appointment_id, "001")
-            self.assertEqual(appointments[0].patient.first_name, "John")
-            self.assertEqual(appointments[0].patient.last_name, "Doe")
-            
-            self.assertEqual(appointments[1].appointment_id, "002")
-            self.assertEqual(appointments[1].patient.first_name, "Jane")
-            self.assertEqual(appointments[1].patient.last_name, "Smith")
+        self.assertEqual(appointments[0].appointment_id, "001")
+        self.assertEqual(appointments[0].patient.first_name, "John")
+        self.assertEqual(appointments[0].patient.last_name, "Doe")
         
-        finally:
-            os.unlink(temp_file)
+        self.assertEqual(appointments[1].appointment_id, "002")
+        self.assertEqual(appointments[1].patient.first_name, "Jane")
+        self.assertEqual(appointments[1].patient.last_name, "Smith")
     
     def test_mixed_message_types(self):
         """Test file with mixed SIU and non-SIU messages."""
@@ -164,18 +205,177 @@ MSH|^~\&|SYS|FAC|SYS|FAC|20250502090001||SIU^S12|MSG002|P|2.5
 PID|||P001||Doe^John
 SCH|001|^^^20250502100000"""
         
+        appointments = HL7FileParser.parse_string(file_content)
+        # Should skip ADT message and only parse SIU
+        self.assertEqual(len(appointments), 1)
+        self.assertEqual(appointments[0].appointment_id, "001")
+    
+    def test_whitespace_around_segments(self):
+        """Test indented and space-padded segments are still parsed."""
+        file_content = (
+            "MSH|^~\\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG001|P|2.5  \n"
+            "    PID|||P001||Doe^John||19850210|M \n"
+            "\tSCH|001|^^^20250502100000^^60\t\n"
+            "   \n"
+            "  MSH|^~\\&|SYS|FAC|SYS|FAC|20250502090001||SIU^S12|MSG002|P|2.5\n"
+            "  PID|||P002||Smith^Jane||19900315|F  \n"
+            "  SCH|002|^^^20250502110000^^60  \n"
+            "\xa0MSH|^~\\&|SYS|FAC|SYS|FAC|20250502090002||SIU^S12|MSG003|P|2.5\n"
+            "\xa0PID|||P003||Roe^Ann||19700101|F\x85\n"
+            "SCH|003|^^^20250502120000^^60\xa0\n"
+        )
+        
+        appointments = HL7FileParser.parse_string(file_content)
+        self.assertEqual(len(appointments), 3)
+        
+        self.assertEqual(appointments[0].appointment_id, "001")
+        self.assertEqual(appointments[0].patient.last_name, "Doe")
+        self.assertEqual(appointments[0].patient.gender, "M")
+        self.assertEqual(appointments[0].appointment_datetime, "2025-05-02T10:00:00")
+        
+        self.assertEqual(appointments[1].appointment_id, "002")
+        self.assertEqual(appointments[1].patient.first_name, "Jane")
+        self.assertEqual(appointments[1].patient.gender, "F")
+        
+        # Non-ASCII whitespace (NBSP, NEL) is stripped like ASCII whitespace
+        self.assertEqual(appointments[2].appointment_id, "003")
+        self.assertEqual(appointments[2].patient.last_name, "Roe")
+        self.assertEqual(appointments[2].patient.gender, "F")
+    
+    def test_split_messages_whitespace(self):
+        """Test split_messages strips each segment and splits at indented MSH lines."""
+        file_content = "MSH|^~\\&|A|B\r\n    PID|||P1 \r\n\r\n  MSH|^~\\&|C|D\n\tSCH|002\n"
+        
+        self.assertEqual(HL7FileParser.split_messages(file_content), [
+            "MSH|^~\\&|A|B\rPID|||P1",
+            "MSH|^~\\&|C|D\rSCH|002",
+        ])
+        
+    def test_iter_appointments(self):
+        """Test lazily iterating over the appointments in a file."""
+        file_content = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG001|P|2.5
+SCH|001|^^^20250502100000^^60
+MSH|^~\&|SYS|FAC|SYS|FAC|20250502090001||SIU^S12|MSG002|P|2.5
+SCH|002|^^^20250502110000^^60"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.hl7', delete=False) as f:
+            f.write(file_content)
+            temp_file = f.name
+        
+        try:
+            appointments = HL7FileParser.iter_appointments(temp_file)
+            self.assertEqual(next(appointments).appointment_id, "001")
+            self.assertEqual([a.appointment_id for a in appointments], ["002"])
+        
+        finally:
+            os.unlink(temp_file)
+    
+    def test_parse_file_processes(self):
+        """Test parsing a file on worker processes keeps every message in order."""
+        message = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG{0:03d}|P|2.5
+SCH|{0:03d}|^^^20250502100000^^60"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.hl7', delete=False) as f:
+            f.write('\n'.join(message.format(i) for i in range(150)))
+            temp_file = f.name
+        
+        try:
+            appointments = HL7FileParser.parse_file(temp_file, processes=2)
+            self.assertEqual([a.appointment_id for a in appointments],
+                             [f"{i:03d}" for i in range(150)])
+            self.assertEqual(appointments, HL7FileParser.parse_file(temp_file))
+        
+        finally:
+            os.unlink(temp_file)
+    
+    def test_parse_file_columns(self):
+        """Test parsing a file into per-field columns."""
+        file_content = r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG001|P|2.5
+SCH|001|^^^20250502100000^^60
+PID|||P001||Doe^John
+MSH|^~\&|SYS|FAC|SYS|FAC|20250502090001||SIU^S12|MSG002|P|2.5
+SCH|002|^^^20250502110000^^60"""
+        
         with tempfile.NamedTemporaryFile(mode='w', suffix='.hl7', delete=False) as f:
             f.write(file_content)
             temp_file = f.name
         
         try:
-            appointments = HL7FileParser.parse_file(temp_file)
-            # Should skip ADT message and only parse SIU
-            self.assertEqual(len(appointments), 1)
-            self.assertEqual(appointments[0].appointment_id, "001")
+            columns = HL7FileParser.parse_file_columns(temp_file)
+            self.assertEqual(columns['appointment_id'], ["001", "002"])
+            self.assertEqual(columns['appointment_datetime'],
+                             ["2025-05-02T10:00:00", "2025-05-02T11:00:00"])
+            self.assertEqual(columns['patient_first_name'], ["John", None])
+            self.assertEqual(columns['provider_id'], [None, None])
         
         finally:
             os.unlink(temp_file)
+    
+    def test_iter_appointments_missing_file(self):
+        """Test that a missing file is reported before iteration starts."""
+        with self.assertRaises(FileNotFoundError):
+            HL7FileParser.iter_appointments('does-not-exist.hl7')
+    
+    def test_iter_appointments_not_started(self):
+        """Test that an empty file is closed even if iteration never starts."""
+        with tempfile.NamedTemporaryFile(suffix='.hl7', delete=False) as f:
+            temp_file = f.name
+        
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always', ResourceWarning)
+                appointments = HL7FileParser.iter_appointments(temp_file)
+                del appointments
+                gc.collect()
+            self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+        
+        finally:
+            os.unlink(temp_file)
+    
+    def test_iter_stream_segments(self):
+        """Test that segments split across read chunks are reassembled."""
+        content = b"MSH|^~\\&|SYS\r\nSCH|001|^^^20250502100000\rPID|||P001\n\nMSH|^~\\&"
+        
+        for chunk_size in (1, 2, 5, 64):
+            segments = list(_iter_stream_segments(io.BytesIO(content), chunk_size))
+            self.assertEqual(segments, list(_iter_segments(content)))
+    
+    def test_iter_directory_appointments(self):
+        """Test parsing every HL7 file in a directory."""
+        messages = {
+            'a.hl7': r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG001|P|2.5
+SCH|001|^^^20250502100000^^60""",
+            'b.hl7': r"""MSH|^~\&|SYS|FAC|SYS|FAC|20250502090001||SIU^S12|MSG002|P|2.5
+SCH|002|^^^20250502110000^^60""",
+        }
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, content in messages.items():
+                with open(os.path.join(temp_dir, name), 'w') as f:
+                    f.write(content)
+            os.mkdir(os.path.join(temp_dir, 'nested'))
+            
+            appointments = HL7FileParser.iter_directory_appointments(temp_dir, max_pending=1)
+            self.assertEqual([a.appointment_id for a in appointments], ["001", "002"])
+    
+    def test_iter_files_appointments_unreadable_file(self):
+        """Test that a file that cannot be read is logged and skipped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepaths = []
+            for name, appointment_id in (('a.hl7', '001'), ('b.hl7', '002'), ('c.hl7', '003')):
+                filepath = os.path.join(temp_dir, name)
+                with open(filepath, 'w') as f:
+                    f.write("MSH|^~\\&|SYS|FAC|SYS|FAC|20250502090000||SIU^S12|MSG|P|2.5\n"
+                            f"SCH|{appointment_id}\n")
+                filepaths.append(filepath)
+            # b.hl7 disappears after the directory was listed
+            os.unlink(filepaths[1])
+            
+            with self.assertLogs('hl7_parser', 'WARNING') as logs:
+                appointments = list(HL7FileParser._iter_files_appointments(filepaths, 1))
+            
+            self.assertEqual([a.appointment_id for a in appointments], ["001", "003"])
+            self.assertIn("b.hl7", logs.output[0])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+"""
+Unit tests for HL7 utility functions.
+"""
+import unittest
+from hl7_parser.utils import parse_hl7_timestamp
+
+
+class TestParseHL7Timestamp(unittest.TestCase):
+    
+    def test_full_timestamp_with_timezone(self):
+        """Test a full timestamp keeps its timezone offset as ±HH:MM."""
+        self.assertEqual(parse_hl7_timestamp("20250502130000+0500"), "2025-05-02T13:00:00+05:00")
+        self.assertEqual(parse_hl7_timestamp("20250502130000-0730"), "2025-05-02T13:00:00-07:30")
+    
+    def test_partial_timestamps(self):
+        """Test shorter timestamps fill the missing parts with their minimum."""
+        self.assertEqual(parse_hl7_timestamp("2025"), "2025-01-01T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("202505"), "2025-05-01T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("20250502"), "2025-05-02T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("2025050213"), "2025-05-02T13:00:00")
+        self.assertEqual(parse_hl7_timestamp("202505021345"), "2025-05-02T13:45:00")
+    
+    def test_odd_lengths(self):
+        """Test a trailing odd digit or fractional seconds are ignored."""
+        self.assertEqual(parse_hl7_timestamp("20250"), "2025-01-01T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("2025050"), "2025-05-01T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("202505021"), "2025-05-02T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("20250502130000.1234"), "2025-05-02T13:00:00")
+    
+    def test_leap_day(self):
+        """Test February 29th is only accepted in leap years."""
+        self.assertEqual(parse_hl7_timestamp("20240229"), "2024-02-29T00:00:00")
+        self.assertIsNone(parse_hl7_timestamp("20250229"))
+    
+    def test_out_of_range(self):
+        """Test out-of-range months, days and times are rejected."""
+        self.assertIsNone(parse_hl7_timestamp("20251301"))
+        self.assertIsNone(parse_hl7_timestamp("20250532"))
+        self.assertIsNone(parse_hl7_timestamp("2025050224"))
+    
+    def test_whitespace(self):
+        """Test surrounding whitespace and a space-padded day are accepted."""
+        self.assertEqual(parse_hl7_timestamp(" 20250502 "), "2025-05-02T00:00:00")
+        self.assertEqual(parse_hl7_timestamp("202505 2"), "2025-05-02T00:00:00")
+    
+    def test_invalid(self):
+        """Test empty and junk input return None."""
+        self.assertIsNone(parse_hl7_timestamp(""))
+        self.assertIsNone(parse_hl7_timestamp("   "))
+        self.assertIsNone(parse_hl7_timestamp("123"))
+        self.assertIsNone(parse_hl7_timestamp("abcd"))
+        self.assertIsNone(parse_hl7_timestamp("2025x502"))
+    
+    def test_non_ascii_digits(self):
+        """Test non-ASCII digits are rejected, even in the year."""
+        self.assertIsNone(parse_hl7_timestamp("٢٠٢٥"))
+        self.assertIsNone(parse_hl7_timestamp("٢٠٢٥0502"))
+        self.assertIsNone(parse_hl7_timestamp("２０２５０５０２"))
+
+
+if __name__ == '__main__':
+    unittest.main()